@@ -1,129 +1,359 @@
-# Recommended filename: PngToBytearray.py
-# Usage: go to console and run "python BytearrayToPng.py my_output_data.py output_reconstructed.png W H (Replace W and H with the original resolution in pixels.)"
-
-from PIL import Image
-import sys
-import math
-import ast
-
-def mono_vlsb_to_image(mono_data, width, height):
-    try:
-        pages = math.ceil(height / 8)
-        expected_bytes = pages * width
-        if len(mono_data) != expected_bytes:
-            print(f"Error: Input bytearray length ({len(mono_data)}) does not match expected length ({expected_bytes}) for {width}x{height} image.", file=sys.stderr)
-            if len(mono_data) < expected_bytes:
-                return None
-            else:
-                print(f"Warning: Input data is longer than expected. Proceeding anyway.", file=sys.stderr)
-        print(f"Reconstructing image: {width} x {height} pixels", file=sys.stderr)
-        print(f"Using {len(mono_data)} bytes of MONO_VLSB data.", file=sys.stderr)
-        print(f"Calculated pages: {pages}", file=sys.stderr)
-        img_out = Image.new('1', (width, height), color=0)
-        byte_index = 0
-        for page in range(pages):
-            for x in range(width):
-                if byte_index >= len(mono_data):
-                    print(f"Warning: Reached end of input bytearray prematurely at byte {byte_index}. Expected {expected_bytes} bytes.", file=sys.stderr)
-                    break
-                current_byte = mono_data[byte_index]
-                for y_bit in range(8):
-                    y = (page * 8) + y_bit
-                    if y < height:
-                        if (current_byte >> y_bit) & 1:
-                            img_out.putpixel((x, y), 255)
-                byte_index += 1
-            if byte_index >= len(mono_data) and page < pages - 1:
-                break
-        print(f"Image reconstruction finished. Processed {byte_index} bytes.", file=sys.stderr)
-        return img_out
-    except Exception as e:
-        print(f"An error occurred during image reconstruction: {e}", file=sys.stderr)
-        return None
-
-def read_bytearray_from_file(filepath):
-    content = None
-    used_encoding = None
-    encodings_to_try = ['utf-8-sig', 'utf-16']
-    for enc in encodings_to_try:
-        try:
-            print(f"Attempting to read file '{filepath}' with encoding: {enc}", file=sys.stderr)
-            with open(filepath, 'r', encoding=enc) as f:
-                content = f.read()
-                used_encoding = enc
-                print(f"Successfully read file using encoding: {enc}", file=sys.stderr)
-                break
-        except UnicodeDecodeError as ude:
-            print(f"Failed to decode using {enc}: {ude}. Trying next...", file=sys.stderr)
-            continue
-        except FileNotFoundError:
-            print(f"Error: Input file not found at '{filepath}'", file=sys.stderr)
-            return None
-        except Exception as e:
-            print(f"An error occurred opening/reading with {enc}: {e}. Trying next...", file=sys.stderr)
-            continue
-    if content is None:
-        print(f"Error: Could not decode file '{filepath}' using any attempted encoding: {encodings_to_try}", file=sys.stderr)
-        print(f"Please ensure the file is saved as UTF-8 or UTF-16 text.", file=sys.stderr)
-        return None
-    try:
-        start_marker = "bytearray(["
-        end_marker = "])"
-        start_index = content.find(start_marker)
-        if start_index == -1:
-            print(f"Error: Could not find '{start_marker}' in the content of {filepath} (read using {used_encoding}).", file=sys.stderr)
-            print(f"First 100 characters read:\n'''{content[:100]}'''", file=sys.stderr)
-            return None
-        search_start_for_end = start_index + len(start_marker)
-        end_index = content.find(end_marker, search_start_for_end)
-        if end_index == -1:
-            print(f"Error: Could not find closing '{end_marker}' after '{start_marker}' definition in {filepath} (read using {used_encoding}).", file=sys.stderr)
-            context_start = max(0, start_index - 20)
-            context_end = min(len(content), start_index + len(start_marker) + 50)
-            print(f"Debug context around start marker:\n'''{content[context_start:context_end]}...'''", file=sys.stderr)
-            return None
-        bytearray_list_str = content[start_index + len(start_marker) - 1 : end_index + 1]
-        try:
-            byte_list = ast.literal_eval(bytearray_list_str)
-        except Exception as parse_error:
-            print(f"Error parsing the bytearray content with ast.literal_eval: {parse_error}", file=sys.stderr)
-            print(f"Problematic string section (first 200 chars):\n'''{bytearray_list_str[:200]}...'''", file=sys.stderr)
-            return None
-        return bytearray(byte_list)
-    except Exception as e:
-        print(f"An unexpected error occurred during parsing after reading the file: {e}", file=sys.stderr)
-        print(f"Exception type: {type(e).__name__}", file=sys.stderr)
-        return None
-
-if __name__ == "__main__":
-    if len(sys.argv) != 5:
-        print("Usage: python reverse_mono_vlsb.py <input_bytearray.py> <output_image.png> <width> <height>", file=sys.stderr)
-        sys.exit(1)
-    input_file = sys.argv[1]
-    output_file = sys.argv[2]
-    try:
-        img_width = int(sys.argv[3])
-        img_height = int(sys.argv[4])
-    except ValueError:
-        print("Error: Width and height must be integers.", file=sys.stderr)
-        sys.exit(1)
-    if img_width <= 0 or img_height <= 0:
-        print("Error: Width and height must be positive.", file=sys.stderr)
-        sys.exit(1)
-    print(f"Reading bytearray from: {input_file}", file=sys.stderr)
-    mono_vlsb_data = read_bytearray_from_file(input_file)
-    if not mono_vlsb_data:
-        sys.exit(1)
-    print(f"Successfully read {len(mono_vlsb_data)} bytes.", file=sys.stderr)
-    reconstructed_image = mono_vlsb_to_image(mono_vlsb_data, img_width, img_height)
-    if reconstructed_image:
-        try:
-            reconstructed_image.save(output_file, "PNG")
-            print(f"Successfully saved reconstructed image to '{output_file}'")
-        except Exception as e:
-            print(f"Error saving image to '{output_file}': {e}", file=sys.stderr)
-            sys.exit(1)
-    else:
-        print("Image reconstruction failed.", file=sys.stderr)
-        sys.exit(1)
-        
+# Recommended filename: PngToBytearray.py
+# Usage: go to console and run "python BytearrayToPng.py my_output_data.py output_reconstructed.png W H (Replace W and H with the original resolution in pixels.)"
+#        For .bin files written with PngToBytearray.py --binary the size is stored in the file: "python BytearrayToPng.py my_output_data.bin output_reconstructed.png"
+
+from PIL import Image
+import sys
+import os
+import ast
+import json
+import mmap
+import re
+import struct
+import base64
+import binascii
+import zlib
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+UTF8_BOM = b'\xef\xbb\xbf'
+UTF16_BOMS = (b'\xff\xfe', b'\xfe\xff')
+BIN_MAGIC = b'VLSB'
+BIN_HEADER = struct.Struct('<4sIII')
+# --cache sidecar: magic, source mtime (ns) and size, then the parsed MONO_VLSB bytes.
+CACHE_SUFFIX = '.cache'
+CACHE_MAGIC = b'VLSC'
+CACHE_HEADER = struct.Struct('<4sqQ')
+COMPRESSED_MARKER = b"bytearray(zlib.decompress(base64.b64decode("
+BASE64_CHUNK_PATTERN = re.compile(rb'b"([A-Za-z0-9+/=]*)"')
+HEX_BYTE_PATTERN = re.compile(rb'0[xX]([0-9a-fA-F]{1,2})')
+# Possessive repeats (Python 3.11+) stop the regex engine from keeping a backtrack point per token,
+# which otherwise costs hundreds of bytes of memory per list entry.
+HEX_TOKEN_REPEAT = b'*+' if sys.version_info >= (3, 11) else b'*'
+HEX_PAIR_LIST_PATTERN = re.compile(rb'\[\s*(?:0[xX][0-9a-fA-F]{2}\s*,\s*)' + HEX_TOKEN_REPEAT + rb'(?:0[xX][0-9a-fA-F]{2}\s*,?\s*)?\]')
+HEX_LIST_SEPARATORS = b'[], \t\r\n\x0b\x0c'
+HEX_LIST_PATTERN = re.compile(rb'\[\s*(?:0[xX][0-9a-fA-F]{1,2}\s*,\s*)' + HEX_TOKEN_REPEAT + rb'(?:0[xX][0-9a-fA-F]{1,2}\s*,?\s*)?\]')
+
+# Rows (bit positions) set in each possible MONO_VLSB byte, used by the pure-Python fallback.
+VLSB_SET_BITS = tuple(tuple(y_bit for y_bit in range(8) if value >> y_bit & 1) for value in range(256))
+
+# Each group of 8 page bytes is an 8x8 bit matrix (byte = column, bit = row). Transposing it with
+# the SWAR steps from Hacker's Delight 7-3 yields 8 row bytes in PIL's MSB-first mode '1' layout.
+# Pages are processed in blocks of about SWAR_BLOCK_BYTES so the temporaries stay in cache.
+SWAR_BLOCK_BYTES = 65536
+
+def vlsb_pages_to_mono_rows(pages_array, width, height, out=None):
+    pages = pages_array.shape[0]
+    row_bytes = (width + 7) >> 3
+    rows = np.empty((pages, 8, row_bytes), dtype=np.uint8) if out is None else out.reshape(pages, 8, row_bytes)
+    block_pages = max(1, SWAR_BLOCK_BYTES // (row_bytes * 8))
+    for first_page in range(0, pages, block_pages):
+        last_page = min(pages, first_page + block_pages)
+        block = pages_array[first_page:last_page]
+        if width & 7:
+            tiles = np.zeros((last_page - first_page, row_bytes * 8), dtype=np.uint8)
+            tiles[:, :width] = block
+        else:
+            tiles = np.ascontiguousarray(block)
+        # Reading the tiles big-endian puts the leftmost column in the top byte, i.e. the pixel MSB.
+        x = tiles.view('>u8').astype(np.uint64)
+        t = (x ^ (x >> 7)) & 0x00AA00AA00AA00AA
+        x ^= t ^ (t << 7)
+        t = (x ^ (x >> 14)) & 0x0000CCCC0000CCCC
+        x ^= t ^ (t << 14)
+        t = (x ^ (x >> 28)) & 0x00000000F0F0F0F0
+        x ^= t ^ (t << 28)
+        tile_rows = x.astype('<u8', copy=False).view(np.uint8).reshape(last_page - first_page, row_bytes, 8)
+        rows[first_page:last_page] = tile_rows.transpose(0, 2, 1)
+    return rows.reshape(pages * 8, row_bytes)[:height]
+
+# Batch callers can pass back the same out= row buffer and image= from a previous call so that
+# decoding frame after frame of one size reuses them instead of allocating new ones.
+def mono_vlsb_to_image(mono_data, width, height, out=None, image=None):
+    try:
+        if width <= 0 or height <= 0:
+            print(f"Error: Invalid image size {width}x{height}; width and height must be positive.", file=sys.stderr)
+            return None
+        pages = (height + 7) >> 3
+        if image is not None and (image.mode != '1' or image.size != (width, height)):
+            print(f"Error: Reused image must be mode '1' and {width}x{height}, got mode '{image.mode}' and {image.size[0]}x{image.size[1]}.", file=sys.stderr)
+            return None
+        if out is not None and np is not None:
+            if getattr(out, 'dtype', None) != np.uint8 or out.shape != (pages * 8, (width + 7) >> 3) or not out.flags['C_CONTIGUOUS']:
+                print(f"Error: Output buffer must be a contiguous uint8 array of shape ({pages * 8}, {(width + 7) >> 3}).", file=sys.stderr)
+                return None
+        expected_bytes = pages * width
+        if len(mono_data) != expected_bytes:
+            print(f"Error: Input bytearray length ({len(mono_data)}) does not match expected length ({expected_bytes}) for {width}x{height} image.", file=sys.stderr)
+            if len(mono_data) < expected_bytes:
+                return None
+            else:
+                print(f"Warning: Input data is longer than expected. Proceeding anyway.", file=sys.stderr)
+        print(f"Reconstructing image: {width} x {height} pixels", file=sys.stderr)
+        print(f"Using {len(mono_data)} bytes of MONO_VLSB data.", file=sys.stderr)
+        print(f"Calculated pages: {pages}", file=sys.stderr)
+        if np is not None:
+            try:
+                zero_copy = memoryview(mono_data).itemsize == 1
+            except TypeError:
+                zero_copy = False
+            if zero_copy:
+                buf = np.frombuffer(mono_data, dtype=np.uint8, count=expected_bytes)
+            else:
+                # Lists and wide-item arrays are read by value, like the pure-Python path does.
+                values = np.asarray(mono_data[:expected_bytes])
+                if values.dtype.kind not in 'biu' or values.size and (values.min() < 0 or values.max() > 255):
+                    print(f"Error: MONO_VLSB data must contain byte values (integers 0-255).", file=sys.stderr)
+                    return None
+                buf = values.astype(np.uint8)
+            packed_rows = vlsb_pages_to_mono_rows(buf.reshape(pages, width), width, height, out)
+            # The row array is handed to PIL through the buffer protocol, without a tobytes() copy.
+            if image is not None:
+                image.frombytes(packed_rows)
+                img_out = image
+            else:
+                img_out = Image.frombuffer('1', (width, height), packed_rows, 'raw', '1', 0, 1)
+            print(f"Image reconstruction finished. Processed {expected_bytes} bytes.", file=sys.stderr)
+            return img_out
+        row_bytes = (width + 7) >> 3
+        # Room for all 8 rows of every page, so padding bits in the last page need no bounds check.
+        packed_rows = bytearray(row_bytes * pages * 8)
+        row_offsets = [tuple(y_bit * row_bytes for y_bit in bits) for bits in VLSB_SET_BITS]
+        byte_index = 0
+        for page in range(pages):
+            y_base = page << 3
+            for x in range(width):
+                if byte_index >= len(mono_data):
+                    print(f"Warning: Reached end of input bytearray prematurely at byte {byte_index}. Expected {expected_bytes} bytes.", file=sys.stderr)
+                    break
+                current_byte = mono_data[byte_index]
+                byte_index += 1
+                if not current_byte:
+                    continue
+                column_offset = y_base * row_bytes + (x >> 3)
+                column_mask = 0x80 >> (x & 7)
+                for row_offset in row_offsets[current_byte]:
+                    packed_rows[column_offset + row_offset] |= column_mask
+            if byte_index >= len(mono_data) and page < pages - 1:
+                break
+        del packed_rows[row_bytes * height:]
+        if image is not None:
+            image.frombytes(packed_rows)
+            img_out = image
+        else:
+            img_out = Image.frombytes('1', (width, height), packed_rows)
+        print(f"Image reconstruction finished. Processed {byte_index} bytes.", file=sys.stderr)
+        return img_out
+    except Exception as e:
+        print(f"An error occurred during image reconstruction: {e}", file=sys.stderr)
+        return None
+
+def read_bytearray_from_file(filepath):
+    try:
+        file_size = os.path.getsize(filepath)
+    except FileNotFoundError:
+        print(f"Error: Input file not found at '{filepath}'", file=sys.stderr)
+        return None
+    except OSError as e:
+        print(f"Error: Could not access file '{filepath}': {e}", file=sys.stderr)
+        return None
+    if file_size == 0:
+        print(f"Error: Input file '{filepath}' is empty.", file=sys.stderr)
+        return None
+    try:
+        print(f"Mapping file '{filepath}' ({file_size} bytes)", file=sys.stderr)
+        with open(filepath, 'rb') as f:
+            content = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except FileNotFoundError:
+        print(f"Error: Input file not found at '{filepath}'", file=sys.stderr)
+        return None
+    except (OSError, ValueError) as e:
+        print(f"Error: Could not read file '{filepath}': {e}", file=sys.stderr)
+        return None
+    try:
+        if content[:len(UTF8_BOM)] == UTF8_BOM:
+            return parse_bytearray_content(content, filepath, 'utf-8-sig')
+        if content[:2] in UTF16_BOMS:
+            try:
+                decoded = content[:].decode('utf-16').encode('utf-8')
+            except UnicodeError as ude:
+                print(f"Error: Could not decode file '{filepath}' as UTF-16: {ude}", file=sys.stderr)
+                print(f"Please ensure the file is saved as UTF-8 or UTF-16 text.", file=sys.stderr)
+                return None
+            return parse_bytearray_content(decoded, filepath, 'utf-16')
+        return parse_bytearray_content(content, filepath, 'utf-8')
+    finally:
+        content.close()
+
+def parse_bytearray_content(content, filepath, used_encoding):
+    print(f"Scanning file content as {used_encoding}", file=sys.stderr)
+    start_marker = b"bytearray(["
+    end_marker = b"])"
+    start_index = content.find(start_marker)
+    if start_index == -1:
+        compressed_index = content.find(COMPRESSED_MARKER)
+        if compressed_index != -1:
+            return read_compressed_bytearray(content, compressed_index + len(COMPRESSED_MARKER), filepath)
+        print(f"Error: Could not find '{start_marker.decode()}' in the content of {filepath} (read using {used_encoding}).", file=sys.stderr)
+        print(f"First 100 characters read:\n'''{content[:100].decode('utf-8', 'replace')}'''", file=sys.stderr)
+        return None
+    search_start_for_end = start_index + len(start_marker)
+    end_index = content.find(end_marker, search_start_for_end)
+    if end_index == -1:
+        print(f"Error: Could not find closing '{end_marker.decode()}' after '{start_marker.decode()}' definition in {filepath} (read using {used_encoding}).", file=sys.stderr)
+        context_start = max(0, start_index - 20)
+        context_end = min(len(content), start_index + len(start_marker) + 50)
+        print(f"Debug context around start marker:\n'''{content[context_start:context_end].decode('utf-8', 'replace')}...'''", file=sys.stderr)
+        return None
+    list_start = start_index + len(start_marker) - 1
+    list_end = end_index + 1
+    if HEX_PAIR_LIST_PATTERN.fullmatch(content, list_start, list_end):
+        # Every token is exactly 0xHH, so dropping separators and the 0x prefixes leaves pure hex digits.
+        hex_digits = content[list_start:list_end].translate(None, HEX_LIST_SEPARATORS)
+        hex_digits = hex_digits.replace(b"0x", b"").replace(b"0X", b"")
+        return binascii.unhexlify(hex_digits)
+    bytearray_list_str = content[list_start:list_end]
+    if HEX_LIST_PATTERN.fullmatch(bytearray_list_str):
+        hex_tokens = HEX_BYTE_PATTERN.findall(bytearray_list_str)
+        hex_digits = b"".join(hex_tokens)
+        if len(hex_digits) != 2 * len(hex_tokens):
+            hex_digits = b"".join(token.zfill(2) for token in hex_tokens)
+        return bytes.fromhex(hex_digits.decode('ascii'))
+    try:
+        byte_list = json.loads(bytearray_list_str)
+    except (ValueError, RecursionError):
+        try:
+            byte_list = ast.literal_eval(bytearray_list_str.decode('utf-8'))
+        except (ValueError, SyntaxError, TypeError, RecursionError) as parse_error:
+            print(f"Error parsing the bytearray content with ast.literal_eval: {parse_error}", file=sys.stderr)
+            print(f"Problematic string section (first 200 chars):\n'''{bytearray_list_str[:200].decode('utf-8', 'replace')}...'''", file=sys.stderr)
+            return None
+    try:
+        return bytes(byte_list)
+    except (TypeError, ValueError) as e:
+        print(f"Error: The bytearray list in {filepath} does not contain byte values (integers 0-255): {e}", file=sys.stderr)
+        return None
+
+def read_compressed_bytearray(content, start_index, filepath):
+    end_index = content.find(b")", start_index)
+    if end_index == -1:
+        print(f"Error: Could not find the end of the compressed bytearray blob in {filepath}.", file=sys.stderr)
+        return None
+    encoded = b"".join(BASE64_CHUNK_PATTERN.findall(content, start_index, end_index))
+    try:
+        return zlib.decompress(base64.b64decode(encoded, validate=True))
+    except (binascii.Error, zlib.error) as e:
+        print(f"Error decoding the compressed bytearray blob in {filepath}: {e}", file=sys.stderr)
+        return None
+
+def read_bytearray_cached(filepath):
+    cache_path = filepath + CACHE_SUFFIX
+    try:
+        source_stat = os.stat(filepath)
+    except OSError:
+        return read_bytearray_from_file(filepath)
+    try:
+        with open(cache_path, 'rb') as f:
+            header = f.read(CACHE_HEADER.size)
+            if len(header) == CACHE_HEADER.size:
+                magic, mtime_ns, size = CACHE_HEADER.unpack(header)
+                if magic == CACHE_MAGIC and mtime_ns == source_stat.st_mtime_ns and size == source_stat.st_size:
+                    print(f"Using cached bytearray from '{cache_path}'", file=sys.stderr)
+                    return f.read()
+        print(f"Cache '{cache_path}' is stale, re-parsing '{filepath}'", file=sys.stderr)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        print(f"Warning: Could not read cache '{cache_path}': {e}", file=sys.stderr)
+    mono_data = read_bytearray_from_file(filepath)
+    if mono_data:
+        temp_path = cache_path + '.tmp'
+        try:
+            with open(temp_path, 'wb') as f:
+                f.write(CACHE_HEADER.pack(CACHE_MAGIC, source_stat.st_mtime_ns, source_stat.st_size))
+                f.write(mono_data)
+            os.replace(temp_path, cache_path)
+            print(f"Saved parsed bytearray cache to '{cache_path}'", file=sys.stderr)
+        except OSError as e:
+            print(f"Warning: Could not write cache '{cache_path}': {e}", file=sys.stderr)
+    return mono_data
+
+def read_bytearray_bin(filepath):
+    try:
+        with open(filepath, 'rb') as f:
+            header = f.read(BIN_HEADER.size)
+            if len(header) != BIN_HEADER.size:
+                print(f"Error: '{filepath}' is too short to contain a MONO_VLSB .bin header.", file=sys.stderr)
+                return None, 0, 0
+            magic, width, height, length = BIN_HEADER.unpack(header)
+            if magic != BIN_MAGIC:
+                print(f"Error: '{filepath}' is not a MONO_VLSB .bin file (bad magic {magic!r}).", file=sys.stderr)
+                return None, 0, 0
+            mono_data = f.read(length)
+    except FileNotFoundError:
+        print(f"Error: Input file not found at '{filepath}'", file=sys.stderr)
+        return None, 0, 0
+    except OSError as e:
+        print(f"Error: Could not read file '{filepath}': {e}", file=sys.stderr)
+        return None, 0, 0
+    if len(mono_data) != length:
+        print(f"Error: '{filepath}' is truncated: header declares {length} bytes, found {len(mono_data)}.", file=sys.stderr)
+        return None, 0, 0
+    print(f"Read binary header: {width}x{height}, {length} bytes.", file=sys.stderr)
+    return mono_data, width, height
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    use_cache = '--cache' in args
+    args = [arg for arg in args if arg != '--cache']
+    binary_input = len(args) > 0 and args[0].lower().endswith('.bin')
+    if len(args) != 4 and not (binary_input and len(args) == 2):
+        print("Usage: python reverse_mono_vlsb.py <input_bytearray.py> <output_image.png> <width> <height> [--cache]", file=sys.stderr)
+        print("       python reverse_mono_vlsb.py <input_data.bin> <output_image.png> [<width> <height>]", file=sys.stderr)
+        print("  --cache (optional): Keep the parsed bytes in <input_bytearray.py>.cache and reuse them while the input is unchanged.", file=sys.stderr)
+        print("  For .bin input the size is read from the file header; a given width and height must match it.", file=sys.stderr)
+        sys.exit(1)
+    input_file = args[0]
+    output_file = args[1]
+    if len(args) == 4:
+        try:
+            img_width = int(args[2])
+            img_height = int(args[3])
+        except ValueError:
+            print("Error: Width and height must be integers.", file=sys.stderr)
+            sys.exit(1)
+        if img_width <= 0 or img_height <= 0:
+            print("Error: Width and height must be positive.", file=sys.stderr)
+            sys.exit(1)
+    if binary_input:
+        if use_cache:
+            print("Warning: --cache has no effect on .bin input, which is already raw bytes. Ignoring.", file=sys.stderr)
+        print(f"Reading binary MONO_VLSB data from: {input_file}", file=sys.stderr)
+        mono_vlsb_data, bin_width, bin_height = read_bytearray_bin(input_file)
+        if mono_vlsb_data is None:
+            sys.exit(1)
+        if len(args) == 4 and (img_width, img_height) != (bin_width, bin_height):
+            print(f"Error: Given size {img_width}x{img_height} does not match the {bin_width}x{bin_height} stored in '{input_file}'.", file=sys.stderr)
+            sys.exit(1)
+        img_width, img_height = bin_width, bin_height
+    else:
+        print(f"Reading bytearray from: {input_file}", file=sys.stderr)
+        mono_vlsb_data = read_bytearray_cached(input_file) if use_cache else read_bytearray_from_file(input_file)
+        if not mono_vlsb_data:
+            sys.exit(1)
+    print(f"Successfully read {len(mono_vlsb_data)} bytes.", file=sys.stderr)
+    reconstructed_image = mono_vlsb_to_image(mono_vlsb_data, img_width, img_height)
+    if reconstructed_image:
+        try:
+            reconstructed_image.save(output_file, "PNG")
+            print(f"Successfully saved reconstructed image to '{output_file}'")
+        except Exception as e:
+            print(f"Error saving image to '{output_file}': {e}", file=sys.stderr)
+            sys.exit(1)
+    else:
+        print("Image reconstruction failed.", file=sys.stderr)
+        sys.exit(1)
+        
@@ -1,145 +1,283 @@
-# Recommended filename: PngToBytearray.py
-# Usage: go to console and run "python PngToBytearray.py your_png.png my_output_data.py"
-
-from PIL import Image, ImageColor
-import sys
-import math
-import os
-
-def image_to_mono_vlsb_alpha_safe(image_path, debug_dir=None):
-    try:
-        if debug_dir and not os.path.exists(debug_dir):
-            try:
-                os.makedirs(debug_dir)
-                print(f"Created debug directory: {debug_dir}", file=sys.stderr)
-            except OSError as e:
-                print(f"Warning: Could not create debug directory '{debug_dir}': {e}", file=sys.stderr)
-                debug_dir = None
-
-        def save_debug_image(img, filename_suffix):
-            if debug_dir:
-                base = os.path.splitext(os.path.basename(image_path))[0]
-                save_path = os.path.join(debug_dir, f"{base}_{filename_suffix}.png")
-                try:
-                    if 'A' in img.mode:
-                        img.save(save_path, 'PNG')
-                    else:
-                        img.save(save_path)
-                    print(f"Saved debug image: {save_path}", file=sys.stderr)
-                except Exception as e:
-                    print(f"Warning: Failed to save debug image '{save_path}': {e}", file=sys.stderr)
-
-        img = Image.open(image_path)
-        print(f"Opened image '{image_path}' with mode: {img.mode}", file=sys.stderr)
-        save_debug_image(img, "0_original_opened")
-
-        if 'A' in img.mode:
-            print("Alpha channel detected, blending onto white background...", file=sys.stderr)
-            bg_white = Image.new('RGB', img.size, ImageColor.getrgb("white"))
-            alpha = img.split()[-1]
-            bg_white.paste(img, mask=alpha)
-            img_processed = bg_white
-            save_debug_image(img_processed, "1a_blended_on_white_RGB")
-        elif img.mode != 'L' and img.mode != '1':
-            print(f"Converting mode {img.mode} to RGB before grayscale.", file=sys.stderr)
-            img_processed = img.convert('RGB')
-            save_debug_image(img_processed, "1a_converted_to_RGB")
-        else:
-            img_processed = img
-            print(f"Image mode {img.mode} suitable for direct grayscale conversion.", file=sys.stderr)
-
-        img_gray = img_processed.convert('L')
-        print(f"Image converted to grayscale mode: {img_gray.mode}", file=sys.stderr)
-        save_debug_image(img_gray, "1b_grayscale")
-
-        img_mapped = img_gray.point(lambda p: 255 if p > 0 else 0, mode='L')
-        print(f"Applied custom threshold (non-black -> white)", file=sys.stderr)
-        save_debug_image(img_mapped, "2_mapped_nonblack_is_white_L")
-
-        img_mono = img_mapped.convert('1')
-        print(f"Image successfully converted to final 1-bit mode: {img_mono.mode}", file=sys.stderr)
-        save_debug_image(img_mono, "3_final_1bit")
-
-        width, height = img_mono.size
-        print(f"Processing image: {width} x {height} pixels", file=sys.stderr)
-
-        output_bytearray = bytearray()
-        pages = math.ceil(height / 8)
-        buffer_size = pages * width
-        print(f"Pages: {pages}, Bytes per page row: {width}", file=sys.stderr)
-
-        for page in range(pages):
-            for x in range(width):
-                current_byte = 0
-                for y_bit in range(8):
-                    y = (page * 8) + y_bit
-                    if y < height:
-                        pixel = img_mono.getpixel((x, y))
-                        bit = 1 if pixel == 255 else 0
-                        current_byte |= (bit << y_bit)
-                output_bytearray.append(current_byte)
-
-        print(f"Total bytes generated: {len(output_bytearray)}", file=sys.stderr)
-        if len(output_bytearray) != buffer_size:
-            print(f"Warning: Generated byte array size ({len(output_bytearray)}) does not match expected size ({buffer_size}).", file=sys.stderr)
-
-        return output_bytearray, width, height
-
-    except FileNotFoundError:
-        print(f"Error: Image file not found at '{image_path}'", file=sys.stderr)
-        return None, 0, 0
-    except Exception as e:
-        print(f"An error occurred during conversion: {e}", file=sys.stderr)
-        return None, 0, 0
-
-def save_bytearray_to_py_file(byte_data, width, height, output_filename):
-    try:
-        with open(output_filename, 'w', encoding='utf-8') as f:
-            print(f"Writing bytearray definition to '{output_filename}'...", file=sys.stderr)
-            f.write(f"# Image: {width}x{height}, Format: MONO_VLSB (Alpha-Safe Non-Black=White), Bytes: {len(byte_data)}\n")
-            f.write(f"image_data = bytearray([\n")
-            f.write("    ")
-            for i, byte in enumerate(byte_data):
-                f.write(f"0x{byte:02X}")
-                if i < len(byte_data) - 1:
-                    f.write(", ")
-                if (i + 1) % 16 == 0 and i < len(byte_data) - 1:
-                    f.write("\n    ")
-            f.write("\n])\n")
-        print(f"Successfully saved bytearray to '{output_filename}'.", file=sys.stderr)
-        return True
-    except Exception as e:
-        print(f"Error writing to output file '{output_filename}': {e}", file=sys.stderr)
-        return False
-
-if __name__ == "__main__":
-    if len(sys.argv) < 3 or len(sys.argv) > 4:
-        script_name = sys.argv[0]
-        print(f"\nUsage: python {script_name} <input_image.png> <output_file.py> [--debug]\n", file=sys.stderr)
-        print("  <input_image.png>: Path to the source image file.", file=sys.stderr)
-        print("  <output_file.py>:  Path to save the generated Python bytearray file.", file=sys.stderr)
-        print("  --debug (optional): Save intermediate processing steps as images in './debug_images'.\n", file=sys.stderr)
-        sys.exit(1)
-
-    image_file = sys.argv[1]
-    output_py_file = sys.argv[2]
-    enable_debug = False
-    debug_directory = "debug_images"
-
-    if len(sys.argv) == 4 and sys.argv[3] == '--debug':
-        enable_debug = True
-        print("Debug mode enabled. Intermediate images will be saved.", file=sys.stderr)
-    elif len(sys.argv) == 4:
-        print(f"Warning: Unknown third argument '{sys.argv[3]}'. Ignoring. Use --debug to enable debug images.", file=sys.stderr)
-
-    debug_dir_param = debug_directory if enable_debug else None
-    mono_data, width, height = image_to_mono_vlsb_alpha_safe(image_file, debug_dir=debug_dir_param)
-
-    if mono_data:
-        if not save_bytearray_to_py_file(mono_data, width, height, output_py_file):
-            sys.exit(1)
-        else:
-            print("\nConversion and saving complete.", file=sys.stderr)
-    else:
-        print("\nConversion failed, bytearray not generated.", file=sys.stderr)
-        sys.exit(1)
+# Recommended filename: PngToBytearray.py
+# Usage: go to console and run "python PngToBytearray.py your_png.png my_output_data.py"
+#        or "python PngToBytearray.py --batch your_png_folder my_output_folder" to convert every PNG in a folder.
+#        Add --binary to write a raw .bin file instead (read back by BytearrayToPng.py without parsing).
+
+from PIL import Image, ImageColor
+import sys
+import os
+import multiprocessing
+import base64
+import struct
+import zlib
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+NON_BLACK_TO_WHITE_LUT = [0] + [255] * 255
+
+# .bin layout: magic, width, height, payload length (all little-endian), then the raw MONO_VLSB bytes.
+BIN_MAGIC = b'VLSB'
+BIN_HEADER = struct.Struct('<4sIII')
+
+# Same fixed-point weights PIL uses for RGB -> L, so "non-black" matches the convert('L') path exactly.
+def rgb_is_non_black(rgb):
+    rgb = rgb[:, :, :3].astype(np.uint32)
+    return rgb[:, :, 0] * 19595 + rgb[:, :, 1] * 38470 + rgb[:, :, 2] * 7471 >= 0x8000
+
+def image_to_mono_vlsb_alpha_safe(image_path, debug_dir=None):
+    try:
+        if debug_dir and not os.path.exists(debug_dir):
+            try:
+                os.makedirs(debug_dir)
+                print(f"Created debug directory: {debug_dir}", file=sys.stderr)
+            except OSError as e:
+                print(f"Warning: Could not create debug directory '{debug_dir}': {e}", file=sys.stderr)
+                debug_dir = None
+
+        debug_base = os.path.splitext(os.path.basename(image_path))[0]
+
+        def write_debug_image(img, filename_suffix):
+            save_path = os.path.join(debug_dir, f"{debug_base}_{filename_suffix}.png")
+            try:
+                img.save(save_path, 'PNG')
+                print(f"Saved debug image: {save_path}", file=sys.stderr)
+            except Exception as e:
+                print(f"Warning: Failed to save debug image '{save_path}': {e}", file=sys.stderr)
+
+        save_debug_image = write_debug_image if debug_dir else (lambda *args, **kwargs: None)
+
+        img = Image.open(image_path)
+        print(f"Opened image '{image_path}' with mode: {img.mode}", file=sys.stderr)
+        save_debug_image(img, "0_original_opened")
+
+        width, height = img.size
+        print(f"Processing image: {width} x {height} pixels", file=sys.stderr)
+
+        pages = (height + 7) >> 3
+        buffer_size = pages * width
+        print(f"Pages: {pages}, Bytes per page row: {width}", file=sys.stderr)
+
+        # --debug takes the PIL pipeline below so every intermediate step can be saved as an image.
+        if np is not None and not debug_dir:
+            if img.mode == '1':
+                print("Image is already 1-bit, packing its pixels directly.", file=sys.stderr)
+                mono_bits = np.asarray(img, dtype=np.uint8)
+            elif img.mode in ('L', 'P'):
+                img_gray = img if img.mode == 'L' else img.convert('L')
+                print(f"Thresholding mode {img.mode} pixels directly (non-black -> white).", file=sys.stderr)
+                mono_bits = (np.asarray(img_gray) > 0).astype(np.uint8)
+            elif 'A' in img.mode:
+                print("Alpha channel detected, thresholding directly against a white background...", file=sys.stderr)
+                rgba = np.asarray(img.convert('RGBA'))
+                mono_bits = ((rgba[:, :, 3] < 255) | rgb_is_non_black(rgba)).astype(np.uint8)
+            else:
+                print(f"Thresholding mode {img.mode} pixels as RGB directly (non-black -> white).", file=sys.stderr)
+                rgb = np.asarray(img if img.mode == 'RGB' else img.convert('RGB'))
+                mono_bits = rgb_is_non_black(rgb).astype(np.uint8)
+
+            pad = (-height) % 8
+            if pad:
+                mono_bits = np.vstack([mono_bits, np.zeros((pad, width), np.uint8)])
+            # packbits is MSB-first; MONO_VLSB wants the top row of each page in the LSB.
+            packed = np.packbits(mono_bits.reshape(pages, 8, width)[:, ::-1, :], axis=1).reshape(pages, width)
+            output_bytearray = bytearray(packed.tobytes())
+        else:
+            if 'A' in img.mode:
+                print("Alpha channel detected, blending onto white background...", file=sys.stderr)
+                bg_white = Image.new('RGB', img.size, ImageColor.getrgb("white"))
+                alpha = img.split()[-1]
+                bg_white.paste(img, mask=alpha)
+                img_processed = bg_white
+                save_debug_image(img_processed, "1a_blended_on_white_RGB")
+            elif img.mode != 'L' and img.mode != '1':
+                print(f"Converting mode {img.mode} to RGB before grayscale.", file=sys.stderr)
+                img_processed = img.convert('RGB')
+                save_debug_image(img_processed, "1a_converted_to_RGB")
+            else:
+                img_processed = img
+                print(f"Image mode {img.mode} suitable for direct grayscale conversion.", file=sys.stderr)
+
+            img_gray = img_processed.convert('L')
+            print(f"Image converted to grayscale mode: {img_gray.mode}", file=sys.stderr)
+            save_debug_image(img_gray, "1b_grayscale")
+
+            img_mapped = img_gray.point(NON_BLACK_TO_WHITE_LUT, mode='L')
+            print(f"Applied custom threshold (non-black -> white)", file=sys.stderr)
+            save_debug_image(img_mapped, "2_mapped_nonblack_is_white_L")
+
+            img_mono = img_mapped.convert('1')
+            print(f"Image successfully converted to final 1-bit mode: {img_mono.mode}", file=sys.stderr)
+            save_debug_image(img_mono, "3_final_1bit")
+
+            pix = img_mono.load()
+            output_bytearray = bytearray(buffer_size)
+            byte_index = 0
+            for page in range(pages):
+                y_base = page << 3
+                page_rows = 8 if page < pages - 1 else height - y_base
+                for x in range(width):
+                    current_byte = 0
+                    for y_bit in range(page_rows):
+                        if pix[x, y_base + y_bit] == 255:
+                            current_byte |= 1 << y_bit
+                    output_bytearray[byte_index] = current_byte
+                    byte_index += 1
+
+        print(f"Total bytes generated: {len(output_bytearray)}", file=sys.stderr)
+        if len(output_bytearray) != buffer_size:
+            print(f"Warning: Generated byte array size ({len(output_bytearray)}) does not match expected size ({buffer_size}).", file=sys.stderr)
+
+        return output_bytearray, width, height
+
+    except FileNotFoundError:
+        print(f"Error: Image file not found at '{image_path}'", file=sys.stderr)
+        return None, 0, 0
+    except Exception as e:
+        print(f"An error occurred during conversion: {e}", file=sys.stderr)
+        return None, 0, 0
+
+def save_bytearray_to_py_file(byte_data, width, height, output_filename):
+    try:
+        with open(output_filename, 'w', encoding='utf-8') as f:
+            print(f"Writing bytearray definition to '{output_filename}'...", file=sys.stderr)
+            f.write(f"# Image: {width}x{height}, Format: MONO_VLSB (Alpha-Safe Non-Black=White), Bytes: {len(byte_data)}\n")
+            f.write(f"image_data = bytearray([\n")
+            hex_digits = bytes(byte_data).hex().upper()
+            tokens = ["0x" + hex_digits[i:i + 2] for i in range(0, len(hex_digits), 2)]
+            lines = (", ".join(tokens[i:i + 16]) for i in range(0, len(tokens), 16))
+            f.write("    " + ", \n    ".join(lines) + "\n])\n")
+        print(f"Successfully saved bytearray to '{output_filename}'.", file=sys.stderr)
+        return True
+    except Exception as e:
+        print(f"Error writing to output file '{output_filename}': {e}", file=sys.stderr)
+        return False
+
+def save_compressed_bytearray_to_py_file(byte_data, width, height, output_filename):
+    try:
+        with open(output_filename, 'w', encoding='utf-8') as f:
+            print(f"Writing compressed bytearray definition to '{output_filename}'...", file=sys.stderr)
+            encoded = base64.b64encode(zlib.compress(bytes(byte_data), 9)).decode('ascii')
+            f.write(f"# Image: {width}x{height}, Format: MONO_VLSB (Alpha-Safe Non-Black=White), Bytes: {len(byte_data)}, Packed: zlib+base64\n")
+            f.write("import base64, zlib\n")
+            f.write("image_data = bytearray(zlib.decompress(base64.b64decode(\n")
+            for i in range(0, len(encoded), 76):
+                f.write(f'    b"{encoded[i:i + 76]}"\n')
+            f.write(")))\n")
+        print(f"Successfully saved compressed bytearray to '{output_filename}' ({len(encoded)} base64 characters).", file=sys.stderr)
+        return True
+    except Exception as e:
+        print(f"Error writing to output file '{output_filename}': {e}", file=sys.stderr)
+        return False
+
+def save_bytearray_to_bin_file(byte_data, width, height, output_filename):
+    try:
+        with open(output_filename, 'wb') as f:
+            print(f"Writing binary MONO_VLSB data to '{output_filename}'...", file=sys.stderr)
+            f.write(BIN_HEADER.pack(BIN_MAGIC, width, height, len(byte_data)))
+            f.write(byte_data)
+        print(f"Successfully saved {len(byte_data)} bytes to '{output_filename}'.", file=sys.stderr)
+        return True
+    except Exception as e:
+        print(f"Error writing to output file '{output_filename}': {e}", file=sys.stderr)
+        return False
+
+def convert_image_file(job):
+    image_path, output_path, debug_dir, save_function = job
+    mono_data, width, height = image_to_mono_vlsb_alpha_safe(image_path, debug_dir=debug_dir)
+    return bool(mono_data) and save_function(mono_data, width, height, output_path)
+
+def convert_directory(input_dir, output_dir, debug_dir=None, save_function=save_bytearray_to_py_file, output_extension='.py'):
+    image_paths = sorted(os.path.join(input_dir, name) for name in os.listdir(input_dir) if name.lower().endswith('.png'))
+    image_paths = [image_path for image_path in image_paths if os.path.isfile(image_path)]
+    if not image_paths:
+        print(f"Error: No PNG files found in '{input_dir}'", file=sys.stderr)
+        return False
+    try:
+        os.makedirs(output_dir, exist_ok=True)
+        if debug_dir:
+            os.makedirs(debug_dir, exist_ok=True)
+    except OSError as e:
+        print(f"Error: Could not create output directory: {e}", file=sys.stderr)
+        return False
+
+    jobs = []
+    for image_path in image_paths:
+        base = os.path.splitext(os.path.basename(image_path))[0]
+        jobs.append((image_path, os.path.join(output_dir, base + output_extension), debug_dir, save_function))
+
+    workers = min(os.cpu_count() or 1, len(jobs))
+    print(f"Converting {len(jobs)} images from '{input_dir}' using {workers} worker processes...", file=sys.stderr)
+    with multiprocessing.Pool(workers) as pool:
+        results = pool.map(convert_image_file, jobs)
+
+    failed = [image_path for image_path, ok in zip(image_paths, results) if not ok]
+    for image_path in failed:
+        print(f"Conversion failed for '{image_path}'", file=sys.stderr)
+    print(f"Converted {len(jobs) - len(failed)} of {len(jobs)} images into '{output_dir}'.", file=sys.stderr)
+    return not failed
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    batch_mode = len(args) > 0 and args[0] == '--batch'
+    if batch_mode:
+        args = args[1:]
+
+    if len(args) < 2:
+        script_name = sys.argv[0]
+        print(f"\nUsage: python {script_name} <input_image.png> <output_file.py> [--debug] [--compressed | --binary]", file=sys.stderr)
+        print(f"       python {script_name} --batch <input_dir> <output_dir> [--debug] [--compressed | --binary]\n", file=sys.stderr)
+        print("  <input_image.png>: Path to the source image file.", file=sys.stderr)
+        print("  <output_file.py>:  Path to save the generated Python bytearray file.", file=sys.stderr)
+        print("  --batch (optional): Convert every PNG in <input_dir> in parallel, writing <name>.py (or <name>.bin with --binary) files into <output_dir>.", file=sys.stderr)
+        print("  --debug (optional): Save intermediate processing steps as images in './debug_images'.", file=sys.stderr)
+        print("  --compressed (optional): Store the bytearray as a zlib-compressed base64 blob instead of a list of hex values.", file=sys.stderr)
+        print("  --binary (optional): Write a raw .bin file (16-byte header + MONO_VLSB bytes) instead of a Python file.\n", file=sys.stderr)
+        sys.exit(1)
+
+    image_file = args[0]
+    output_py_file = args[1]
+    enable_debug = False
+    save_function = save_bytearray_to_py_file
+    output_extension = '.py'
+    debug_directory = "debug_images"
+
+    for option in args[2:]:
+        if option == '--debug':
+            enable_debug = True
+            print("Debug mode enabled. Intermediate images will be saved.", file=sys.stderr)
+        elif option == '--compressed':
+            save_function = save_compressed_bytearray_to_py_file
+            output_extension = '.py'
+            print("Compressed output enabled. The bytearray will be stored as a zlib+base64 blob.", file=sys.stderr)
+        elif option == '--binary':
+            save_function = save_bytearray_to_bin_file
+            output_extension = '.bin'
+            print("Binary output enabled. The data will be written as a raw .bin file.", file=sys.stderr)
+        else:
+            print(f"Warning: Unknown argument '{option}'. Ignoring. Use --debug to enable debug images, --compressed or --binary to change the output format.", file=sys.stderr)
+
+    debug_dir_param = debug_directory if enable_debug else None
+
+    if batch_mode:
+        if not os.path.isdir(image_file):
+            print(f"Error: Input directory not found at '{image_file}'", file=sys.stderr)
+            sys.exit(1)
+        if not convert_directory(image_file, output_py_file, debug_dir=debug_dir_param, save_function=save_function, output_extension=output_extension):
+            print("\nBatch conversion finished with errors.", file=sys.stderr)
+            sys.exit(1)
+        print("\nBatch conversion and saving complete.", file=sys.stderr)
+        sys.exit(0)
+
+    mono_data, width, height = image_to_mono_vlsb_alpha_safe(image_file, debug_dir=debug_dir_param)
+
+    if mono_data:
+        if not save_function(mono_data, width, height, output_py_file):
+            sys.exit(1)
+        else:
+            print("\nConversion and saving complete.", file=sys.stderr)
+    else:
+        print("\nConversion failed, bytearray not generated.", file=sys.stderr)
+        sys.exit(1)